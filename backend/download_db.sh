@@ -4,6 +4,8 @@ set -e
 # Download database from R2
 R2_URL="https://laion-data-assets.inference.net/db.sqlite"
 DB_PATH="data/db.sqlite"
+# ETag of the downloaded copy, so unchanged databases are not fetched again
+ETAG_PATH="${DB_PATH}.etag"
 
 echo "==> Downloading database from R2..."
 echo "    Source: ${R2_URL}"
@@ -12,8 +14,34 @@ echo "    Target: ${DB_PATH}"
 # Create data directory if it doesn't exist
 mkdir -p data
 
-# Download the database
-curl -L -o "${DB_PATH}" "${R2_URL}"
+# Only send If-None-Match when the local copy it describes is still there
+ETAG_ARGS=()
+if [ -f "${DB_PATH}" ] && [ -f "${ETAG_PATH}" ]; then
+    ETAG_ARGS=(--etag-compare "${ETAG_PATH}")
+fi
+
+# Download to a temporary file so a 304 or failed transfer leaves the current database untouched
+HTTP_STATUS=$(curl -L -o "${DB_PATH}.tmp" --etag-save "${ETAG_PATH}.tmp" -w "%{http_code}" "${ETAG_ARGS[@]}" "${R2_URL}") || {
+    rm -f "${DB_PATH}.tmp" "${ETAG_PATH}.tmp"
+    echo "Error: download failed"
+    exit 1
+}
+
+if [ "${HTTP_STATUS}" = "304" ]; then
+    rm -f "${DB_PATH}.tmp" "${ETAG_PATH}.tmp"
+    echo "==> Database unchanged, keeping local copy"
+    echo "    Location: ${DB_PATH}"
+    exit 0
+fi
+
+if [ "${HTTP_STATUS}" != "200" ]; then
+    rm -f "${DB_PATH}.tmp" "${ETAG_PATH}.tmp"
+    echo "Error: download failed with HTTP status ${HTTP_STATUS}"
+    exit 1
+fi
+
+mv "${DB_PATH}.tmp" "${DB_PATH}"
+mv "${ETAG_PATH}.tmp" "${ETAG_PATH}"
 
 echo "==> Database downloaded successfully!"
 echo "    Location: ${DB_PATH}"
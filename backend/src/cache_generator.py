@@ -1,157 +1,293 @@
 """Generate and cache compressed API responses in SQLite tables."""
 
-import json
+import logging
 import sqlite3
-import time
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 
-from models import ClusterInfo, ClustersResponse
+logger = logging.getLogger(__name__)
 
 # Paths
 DB_PATH = Path(__file__).parent.parent / "data" / "db.sqlite"
 
+# Cluster color palette (kept in sync with CLUSTER_COLORS in worker.py)
+_CLUSTER_COLORS: tuple[str, ...] = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+    "#aec7e8",
+    "#ffbb78",
+    "#98df8a",
+    "#ff9896",
+    "#c5b0d5",
+    "#c49c94",
+    "#f7b6d2",
+    "#c7c7c7",
+    "#dbdb8d",
+    "#9edae5",
+    "#393b79",
+    "#637939",
+    "#8c6d31",
+    "#843c39",
+    "#7b4173",
+    "#5254a3",
+    "#8ca252",
+    "#bd9e39",
+    "#ad494a",
+    "#a55194",
+)
+_UNCLUSTERED = "#E8E8E8"  # Light gray pastel for unclustered
 
-def get_db():
-    """Get database connection."""
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    return conn
+# Builds the whole ClustersResponse JSON in SQLite: one grouped scan, colors looked
+# up in the cluster_colors table, and no per-row Python objects on the way out.
+# The JSON comes back as a BLOB so it arrives as UTF-8 bytes, ready for gzip.
+_CLUSTERS_CACHE_QUERY = f"""
+    SELECT CAST(json_object('clusters', json_group_array(json_object(
+               'cluster_id', cluster_id,
+               'cluster_label', cluster_label,
+               'count', count,
+               'color', color
+           ))) AS BLOB),
+           COUNT(*)
+    FROM (
+        SELECT cluster_id,
+               COALESCE(claude_label, cluster_label) as cluster_label,
+               COUNT(*) as count,
+               CASE WHEN cluster_id < 0 THEN ?
+                    ELSE (SELECT color FROM cluster_colors WHERE idx = cluster_id % {len(_CLUSTER_COLORS)})
+               END as color
+        FROM papers
+        WHERE cluster_id IS NOT NULL AND x IS NOT NULL
+        GROUP BY cluster_id, COALESCE(claude_label, cluster_label)
+        ORDER BY cluster_id
+    )
+"""
 
 
-def initialize_cache_tables():
-    """Create cache table if it doesn't exist."""
-    print("Initializing cache table...")
+# Connection tuning, applied once when the shared connection is opened. Cache
+# rebuilds are bulk writes, so trade fsyncs for throughput. (WAL itself is a
+# persistent database setting and is enabled in initialize_cache_tables.)
+_PRAGMAS = (
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA cache_spill=OFF",
+)
+
+_UPSERT_CLUSTERS_CACHE = "INSERT OR REPLACE INTO cache_clusters (id, data, encoding, created_at) VALUES (1, ?, 'gzip', CURRENT_TIMESTAMP)"
+
+# Shared connection so pragmas run once and sqlite3's statement cache is reused
+_conn: sqlite3.Connection | None = None
+
+
+def get_db() -> sqlite3.Connection:
+    """Get the shared database connection, opening it on first use."""
+    global _conn
+    if _conn is None:
+        # Autocommit mode: write transactions are opened and closed explicitly in
+        # writable_db(), so sqlite3 never injects its own BEGIN (e.g. before DDL).
+        # Plain tuple rows: callers unpack positionally, so skip sqlite3.Row's name lookups.
+        _conn = sqlite3.connect(str(DB_PATH), isolation_level=None, check_same_thread=False, timeout=30)
+        for pragma in _PRAGMAS:
+            _conn.execute(pragma)
+    return _conn
+
+
+def close_db():
+    """Close the shared database connection if it is open."""
+    global _conn
+    if _conn is not None:
+        # Fold the WAL back into the main file so db.sqlite can be copied on its own
+        _conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        _conn.close()
+        _conn = None
+
+
+@contextmanager
+def writable_db() -> Iterator[tuple[sqlite3.Connection, sqlite3.Cursor]]:
+    """Yield the shared connection and a cursor inside a single write transaction.
+
+    Commits on success and rolls back on error.
+    """
     conn = get_db()
     cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn, cursor
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+    finally:
+        cursor.close()
+
+
+def bulk_upsert(cursor: sqlite3.Cursor, sql: str, rows: Iterable[Sequence], batch_size: int = 10_000) -> int:
+    """Write rows with executemany in fixed-size batches; returns the row count.
+
+    Call inside writable_db() so every batch shares one transaction.
+    """
+    total = 0
+    it = iter(rows)
+    while batch := list(islice(it, batch_size)):
+        cursor.executemany(sql, batch)
+        total += len(batch)
+    return total
+
+
+def initialize_cache_tables():
+    """(Re)create cache tables and supporting indexes."""
+    logger.info("Initializing cache table...")
+    # WAL lets API readers keep their snapshot while the generator commits.
+    # journal_mode can't change inside a transaction, so set it before writing.
+    get_db().execute("PRAGMA journal_mode=WAL")
+    with writable_db() as (_, cursor):
+        # Table for clusters cache (gzip-compressed JSON, served as-is by the API).
+        # Cache tables are rebuilt on every run, so recreate to pick up schema changes.
+        cursor.execute("DROP TABLE IF EXISTS cache_clusters")
+        cursor.execute("""
+            CREATE TABLE cache_clusters (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                data BLOB NOT NULL,
+                encoding TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
 
-    # Table for clusters cache (JSON format, small so no compression needed)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS cache_clusters (
-            id INTEGER PRIMARY KEY CHECK (id = 1),
-            data TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    conn.commit()
-    conn.close()
-    print("  Cache table ready")
-
-
-def get_cluster_color(cluster_id: int) -> str:
-    """Get consistent color for a cluster (copied from main.py)."""
-    cluster_colors = [
-        "#1f77b4",
-        "#ff7f0e",
-        "#2ca02c",
-        "#d62728",
-        "#9467bd",
-        "#8c564b",
-        "#e377c2",
-        "#7f7f7f",
-        "#bcbd22",
-        "#17becf",
-        "#aec7e8",
-        "#ffbb78",
-        "#98df8a",
-        "#ff9896",
-        "#c5b0d5",
-        "#c49c94",
-        "#f7b6d2",
-        "#c7c7c7",
-        "#dbdb8d",
-        "#9edae5",
-        "#393b79",
-        "#637939",
-        "#8c6d31",
-        "#843c39",
-        "#7b4173",
-        "#5254a3",
-        "#8ca252",
-        "#bd9e39",
-        "#ad494a",
-        "#a55194",
-    ]
-    if cluster_id < 0:
-        return "#E8E8E8"  # Light gray pastel for unclustered
-    return cluster_colors[cluster_id % len(cluster_colors)]
+        # Palette lookup table joined by the cache queries (color = palette[cluster_id % 30])
+        cursor.execute("CREATE TABLE IF NOT EXISTS cluster_colors (idx INTEGER PRIMARY KEY, color TEXT NOT NULL)")
+        cursor.execute("DELETE FROM cluster_colors")
+        bulk_upsert(cursor, "INSERT INTO cluster_colors (idx, color) VALUES (?, ?)", enumerate(_CLUSTER_COLORS))
+
+        # Partial covering index for the clusters aggregation
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_papers_cluster
+            ON papers(cluster_id, claude_label, cluster_label)
+            WHERE cluster_id IS NOT NULL AND x IS NOT NULL
+        """)
+
+        # Per-cluster "most recent N papers" sampling in /api/papers?sample_size=N
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_papers_cluster_year_id
+            ON papers(cluster_id, publication_year DESC, id DESC)
+            WHERE x IS NOT NULL AND y IS NOT NULL
+        """)
+
+        # Covering index for the per-cluster, per-year counts in /api/temporal-data
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_papers_cluster_year_count
+            ON papers(cluster_id, publication_year, claude_label, cluster_label)
+            WHERE cluster_id IS NOT NULL AND publication_year IS NOT NULL
+        """)
+
+        # Refresh planner statistics so the new indexes are picked up
+        cursor.execute("ANALYZE")
+
+    logger.info("  Cache table ready")
+
+
+def build_search_index():
+    """(Re)build the full-text index used by /api/search."""
+    logger.info("Building search index...")
+    with writable_db() as (_, cursor):
+        # Trigram tokens let MATCH answer the case-insensitive substring queries of the
+        # API's LIKE fallback, though with Unicode rather than ASCII-only case folding.
+        # External content keeps the index free of copies of the text; it is rebuilt on
+        # every run rather than kept in sync by triggers.
+        cursor.execute("DROP TABLE IF EXISTS papers_fts")
+        cursor.execute("""
+            CREATE VIRTUAL TABLE papers_fts USING fts5(
+                title, field_subfield,
+                content='papers', content_rowid='id', tokenize='trigram'
+            )
+        """)
+        cursor.execute("INSERT INTO papers_fts(papers_fts) VALUES('rebuild')")
+    logger.info("  Search index ready")
 
 
 def generate_clusters_cache():
     """Generate cached response for clusters query and store in SQLite."""
-    print("Generating cache for clusters...")
-    start_time = time.time()
+    # Generation-only imports stay local so importing get_db() stays cheap
+    import gzip
+    import time
 
-    conn = get_db()
-    cursor = conn.cursor()
+    logger.info("Generating cache for clusters...")
+    start_time = time.perf_counter()
 
-    query = """
-        SELECT cluster_id,
-               COALESCE(claude_label, cluster_label) as cluster_label,
-               COUNT(*) as count
-        FROM papers
-        WHERE cluster_id IS NOT NULL AND x IS NOT NULL
-        GROUP BY cluster_id, COALESCE(claude_label, cluster_label)
-        ORDER BY cluster_id
-    """
+    with writable_db() as (_, cursor):
+        query_start = time.perf_counter()
+        cursor.execute(_CLUSTERS_CACHE_QUERY, (_UNCLUSTERED,))
+        json_bytes, num_clusters = cursor.fetchone()
+        query_time = time.perf_counter() - query_start
 
-    query_start = time.time()
-    cursor.execute(query)
-    rows = cursor.fetchall()
-    query_time = time.time() - query_start
-    print(f"  DB Query: {query_time:.3f}s, {len(rows)} clusters")
-
-    clusters = [
-        ClusterInfo(
-            cluster_id=row["cluster_id"],
-            cluster_label=row["cluster_label"],
-            count=row["count"],
-            color=get_cluster_color(row["cluster_id"]),
-        )
-        for row in rows
-    ]
-
-    response_data = ClustersResponse(clusters=clusters)
-
-    # Serialize to JSON (no compression needed for small payload)
-    serialization_start = time.time()
-    json_str = json.dumps(response_data.model_dump())
-    serialization_time = time.time() - serialization_start
-    print(f"  Serialization: {serialization_time:.3f}s")
-
-    # Save to SQLite cache table
-    save_start = time.time()
-    cursor.execute(
-        "INSERT OR REPLACE INTO cache_clusters (id, data, created_at) VALUES (1, ?, CURRENT_TIMESTAMP)",
-        (json_str,),
-    )
-    conn.commit()
-    save_time = time.time() - save_start
-    print(f"  DB Write: {save_time:.3f}s")
+        compression_start = time.perf_counter()
+        compressed_content = gzip.compress(json_bytes, compresslevel=6, mtime=0)
+        compression_time = time.perf_counter() - compression_start
+
+        # Save to SQLite cache table
+        save_start = time.perf_counter()
+        bulk_upsert(cursor, _UPSERT_CLUSTERS_CACHE, [(compressed_content,)])
+    save_time = time.perf_counter() - save_start
+    total_time = time.perf_counter() - start_time
+
+    # Timings are logged after the timed sections so output never lands inside them
+    logger.debug("  DB Query: %.3fs, %d clusters", query_time, num_clusters)
+    logger.debug("  Compression: %.3fs", compression_time)
+    logger.debug("  DB Write: %.3fs", save_time)
+    logger.debug("  Total: %.3fs", total_time)
 
-    total_time = time.time() - start_time
-    size = len(json_str.encode("utf-8"))
+    uncompressed_size = len(json_bytes)
+    compressed_size = len(compressed_content)
+    compression_ratio = (compressed_size / uncompressed_size) * 100
+    logger.info(f"  Size: {uncompressed_size:,} -> {compressed_size:,} bytes ({compression_ratio:.1f}% compression)")
+    logger.info("  Saved to: cache_clusters table")
 
-    print(f"  Total: {total_time:.3f}s")
-    print(f"  Size: {size:,} bytes")
-    print("  Saved to: cache_clusters table")
 
-    conn.close()
+def compact_db():
+    """Rewrite the database file to drop pages freed by the rebuilt cache tables."""
+    logger.info("Compacting database...")
+    # VACUUM can't run inside a transaction, so it bypasses writable_db()
+    get_db().execute("VACUUM")
+    logger.info("  Database compacted")
 
 
 if __name__ == "__main__":
-    print("=" * 60)
-    print("API Response Cache Generator")
-    print("=" * 60)
-    print()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate API response caches in SQLite")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log per-step timings")
+    parser.add_argument("--vacuum", action="store_true", help="Compact the database file after generating caches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
+
+    logger.info("=" * 60)
+    logger.info("API Response Cache Generator")
+    logger.info("=" * 60)
 
     # Initialize cache table
     initialize_cache_tables()
-    print()
 
     # Generate clusters cache
     generate_clusters_cache()
-    print()
 
-    print("✓ Cache generation complete!")
-    print("✓ Cluster data stored in SQLite cache table")
+    # Full-text search index
+    build_search_index()
+
+    if args.vacuum:
+        compact_db()
+
+    close_db()
+
+    logger.info("✓ Cache generation complete!")
+    logger.info("✓ Cluster data stored in SQLite cache table")
@@ -1,6 +1,14 @@
 """Pydantic models for API responses."""
 
+from typing import Any
+
 from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def serialize(obj: Any) -> bytes:
+    """Serialize a model (or a plain container of models) straight to JSON bytes."""
+    return to_json(obj)
 
 
 class PaperSummary(BaseModel):
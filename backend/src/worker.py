@@ -1,23 +1,25 @@
 """FastAPI server for paper visualization."""
 
-import gzip
+import functools
+import itertools
 import json
 import logging
 import os
 import sqlite3
 import time
-from collections.abc import Sequence
+import zlib
+from collections.abc import AsyncIterator, Mapping, Sequence
 from pathlib import Path
 from typing import Any
 
 from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
 from workers import WorkerEntrypoint
 
 from models import (
     ClusterInfo,
-    ClustersResponse,
     ClusterTemporalData,
     PaperDetail,
     PaperSample,
@@ -26,6 +28,7 @@ from models import (
     PaperSummary,
     TemporalDataPoint,
     TemporalDataResponse,
+    serialize,
 )
 
 # Configure logging
@@ -72,16 +75,26 @@ else:
 
 logger.info(f"Using database at: {DB_PATH.resolve()} (exists: {DB_PATH.exists()})")
 CACHE_TTL_SECONDS = 5
+# Level 1 is several times cheaper than the default 6 for a modestly larger payload;
+# compression CPU dominates the papers response once serialization is native
+GZIP_COMPRESSLEVEL = 1
+# Fully built bodies of the unfiltered endpoints are kept in-process for the same
+# window as the HTTP cache, so a regenerated database is picked up just as quickly
+_response_cache: dict[str, tuple[float, bytes, str, dict[str, str]]] = {}
+# Caching headers are identical for every response, so they are built once
+_CACHE_CONTROL_VALUE = f"public, max-age={CACHE_TTL_SECONDS}"
+_CACHE_HEADERS = {
+    "Cache-Control": _CACHE_CONTROL_VALUE,
+    "CDN-Cache-Control": _CACHE_CONTROL_VALUE,
+    "Surrogate-Control": _CACHE_CONTROL_VALUE,
+}
 
 
 @app.middleware("http")
 async def apply_cache_headers(request: Request, call_next):
     """Apply short-lived caching so browsers and Cloudflare cache responses."""
     response = await call_next(request)
-    cache_control_value = f"public, max-age={CACHE_TTL_SECONDS}"
-    response.headers["Cache-Control"] = cache_control_value
-    response.headers["CDN-Cache-Control"] = cache_control_value
-    response.headers["Surrogate-Control"] = cache_control_value
+    response.headers.update(_CACHE_HEADERS)
 
     # Ensure compressed responses vary correctly for downstream caches.
     if "Vary" in response.headers:
@@ -133,83 +146,202 @@ def _normalize_params(params: Sequence[Any] | None) -> Sequence[Any]:
     return (params,)
 
 
+# Reused serializer for paper lists: dumps straight to JSON bytes in one native pass
+_PAPER_LIST_ADAPTER = TypeAdapter(list[PaperSummary])
+
+
+class _PapersBodyWriter:
+    """Serialize paper rows into a gzipped PapersResponse JSON body, one batch at a time.
+
+    Rows come straight from SQLite with the PaperSummary columns and known types, so
+    models are built without validation and the wrapper object is never allocated.
+    Each batch is compressed as soon as it is encoded, so only one batch of
+    uncompressed JSON is alive at a time instead of the whole body.
+    """
+
+    _BATCH_SIZE = 5_000
+
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(GZIP_COMPRESSLEVEL, zlib.DEFLATED, 31)  # wbits=31: gzip container
+        self._parts: list[bytes] = []
+        self.count = 0
+        self.uncompressed_size = 0
+        self._write(b'{"papers":[')
+
+    def _write(self, chunk: bytes) -> None:
+        self.uncompressed_size += len(chunk)
+        self._parts.append(self._compressor.compress(chunk))
+
+    def write(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        for start in range(0, len(rows), self._BATCH_SIZE):
+            papers = [PaperSummary.model_construct(**row) for row in rows[start : start + self._BATCH_SIZE]]
+            if self.count:
+                self._write(b",")
+            # Strip the list brackets so consecutive batches form one JSON array
+            self._write(_PAPER_LIST_ADAPTER.dump_json(papers)[1:-1])
+            self.count += len(papers)
+
+    def finish(self) -> bytes:
+        self._write(b"]}")
+        self._parts.append(self._compressor.flush())
+        return b"".join(self._parts)
+
+
+def _title_column(include_titles: bool) -> str:
+    """Select-list entry for the title column; titles are the bulk of a paper row, so list endpoints can skip them."""
+    return "title" if include_titles else "NULL as title"
+
+
+def _get_cached_response(key: str) -> Response | None:
+    """Return a response rebuilt from the in-process cache, or None if missing or stale."""
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    cached_at, content, media_type, headers = entry
+    if time.monotonic() - cached_at > CACHE_TTL_SECONDS:
+        del _response_cache[key]
+        return None
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+def _cache_response(key: str, content: bytes, media_type: str, headers: dict[str, str] | None = None) -> Response:
+    """Store a response body in the in-process cache and return it as a response."""
+    headers = headers or {}
+    _response_cache[key] = (time.monotonic(), content, media_type, headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+async def _fetch_r2_asset(url: str) -> bytes:
+    """Fetch an R2 asset with the native Workers fetch API and return its body as bytes."""
+    from js import fetch as js_fetch
+
+    response = await js_fetch(url)
+    if not response.ok:
+        raise Exception(f"R2 fetch failed with status {response.status}")
+
+    # Convert the JavaScript ArrayBuffer to Python bytes
+    array_buffer = await response.arrayBuffer()
+    return bytes(array_buffer.to_py())
+
+
+def _blob_to_bytes(value: Any) -> bytes:
+    """Convert a BLOB column value to bytes (D1 returns BLOBs as JS arrays, converted to lists of ints)."""
+    if isinstance(value, bytes | bytearray | memoryview | list):
+        return bytes(value)
+    return bytes(value.to_py())
+
+
 class BaseDatabase:
-    async def fetch_all(self, query: str, params: Sequence[Any] | None = None) -> list[dict[str, Any]]:
+    async def fetch_all(self, query: str, params: Sequence[Any] | None = None) -> Sequence[Mapping[str, Any]]:
         raise NotImplementedError
 
-    async def fetch_one(self, query: str, params: Sequence[Any] | None = None) -> dict[str, Any] | None:
+    async def fetch_batches(self, query: str, params: Sequence[Any] | None = None, batch_size: int = 10_000) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+        """Yield query results in batches; by default the whole result is one batch."""
+        yield await self.fetch_all(query, params)
+
+    async def fetch_one(self, query: str, params: Sequence[Any] | None = None) -> Mapping[str, Any] | None:
         raise NotImplementedError
 
 
 class SqliteDatabase(BaseDatabase):
+    # Connections are shared per path for the life of the process instead of being
+    # reopened per query. Queries run synchronously on the event loop thread, so a
+    # single connection is never used concurrently.
+    _connections: dict[Path, sqlite3.Connection] = {}
+
     def __init__(self, db_path: Path) -> None:
         self.db_path = db_path
-        logger.info(f"SqliteDatabase initialized with path: {self.db_path.resolve()}")
-        logger.info(f"Database file exists: {self.db_path.exists()}")
+        if db_path not in self._connections:
+            logger.info(f"SqliteDatabase initialized with path: {self.db_path.resolve()}")
+            logger.info(f"Database file exists: {self.db_path.exists()}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = self._connections.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            for pragma in ("temp_store=MEMORY", "cache_size=-65536", "mmap_size=268435456"):
+                conn.execute(f"PRAGMA {pragma}")
+            self._connections[self.db_path] = conn
+        return conn
+
+    async def fetch_all(self, query: str, params: Sequence[Any] | None = None) -> Sequence[Mapping[str, Any]]:
+        params = _normalize_params(params)
+        try:
+            # sqlite3.Row already supports lookup by column name, so rows are returned as-is
+            return self._connection().execute(query, params).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.error(f"SQLite error with db_path={self.db_path.resolve()}, exists={self.db_path.exists()}: {e}")
+            raise
 
-    async def fetch_all(self, query: str, params: Sequence[Any] | None = None) -> list[dict[str, Any]]:
+    async def fetch_batches(self, query: str, params: Sequence[Any] | None = None, batch_size: int = 10_000) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
         params = _normalize_params(params)
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            cursor = self._connection().execute(query, params)
+            while batch := cursor.fetchmany(batch_size):
+                yield batch
         except sqlite3.OperationalError as e:
             logger.error(f"SQLite error with db_path={self.db_path.resolve()}, exists={self.db_path.exists()}: {e}")
             raise
 
-    async def fetch_one(self, query: str, params: Sequence[Any] | None = None) -> dict[str, Any] | None:
+    async def fetch_one(self, query: str, params: Sequence[Any] | None = None) -> Mapping[str, Any] | None:
         params = _normalize_params(params)
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                row = cursor.fetchone()
-            return dict(row) if row else None
+            return self._connection().execute(query, params).fetchone()
         except sqlite3.OperationalError as e:
             logger.error(f"SQLite error with db_path={self.db_path.resolve()}, exists={self.db_path.exists()}: {e}")
             raise
 
 
 class D1Database(BaseDatabase):
+    # Upper bound on cached statements; queries with variable IN (...) lists add one entry per length
+    _MAX_CACHED_STATEMENTS = 128
+
     def __init__(self, binding: Any) -> None:
         self.binding = binding
-
-    def _convert_row(self, row: Any) -> dict[str, Any]:
-        """Convert a D1 row (JsProxy) to a Python dict, handling null values."""
-        result = {}
-        for key, value in row.object_entries():
-            # Convert JavaScript null to Python None
-            # Check type name as JsNull doesn't work well with isinstance
-            type_name = type(value).__name__
-            if value is None or type_name == "JsNull":
-                result[key] = None
-            else:
-                result[key] = value
-        return result
-
-    async def fetch_all(self, query: str, params: Sequence[Any] | None = None) -> list[dict[str, Any]]:
+        self._statements: dict[str, Any] = {}
+
+    def _prepare(self, query: str) -> Any:
+        """Return a prepared statement for query, reusing one prepared earlier on this binding."""
+        statement = self._statements.get(query)
+        if statement is None:
+            statement = self.binding.prepare(query)
+            if len(self._statements) < self._MAX_CACHED_STATEMENTS:
+                self._statements[query] = statement
+        return statement
+
+    def _convert_row(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Replace JavaScript nulls left in a converted D1 row with Python None."""
+        # Check type name as JsNull doesn't work well with isinstance
+        for key, value in row.items():
+            if value is not None and type(value).__name__ == "JsNull":
+                row[key] = None
+        return row
+
+    async def fetch_all(self, query: str, params: Sequence[Any] | None = None) -> Sequence[Mapping[str, Any]]:
         params = _normalize_params(params)
-        statement = self.binding.prepare(query)
+        # bind() returns a new statement, so the cached one is never mutated
+        statement = self._prepare(query)
         if params:
             statement = statement.bind(*params)
         result = await statement.all()
-        # Convert JsProxy objects to Python dicts
-        return [self._convert_row(row) for row in result.results]
+        # Convert the whole JsProxy result array to Python dicts in a single to_py() call
+        return [self._convert_row(row) for row in result.results.to_py()]
 
-    async def fetch_one(self, query: str, params: Sequence[Any] | None = None) -> dict[str, Any] | None:
+    async def fetch_one(self, query: str, params: Sequence[Any] | None = None) -> Mapping[str, Any] | None:
         params = _normalize_params(params)
-        statement = self.binding.prepare(query)
+        # bind() returns a new statement, so the cached one is never mutated
+        statement = self._prepare(query)
         if params:
             statement = statement.bind(*params)
         result = await statement.first()
         # Convert JsProxy object to Python dict
         if result is None:
             return None
-        return self._convert_row(result)
+        return self._convert_row(result.to_py())
+
+
+_d1_database: D1Database | None = None
 
 
 def get_database(request: Request | None = None) -> BaseDatabase:
@@ -219,12 +351,18 @@ def get_database(request: Request | None = None) -> BaseDatabase:
         if env is not None:
             binding = getattr(env, "LAION_DB", None) or getattr(env, "DB", None)
             if binding is not None:
-                return D1Database(binding)
+                global _d1_database
+                # Keep one client per binding so its prepared statements outlive the request.
+                # Pyodide hands out a fresh proxy on every attribute access, so compare with ==
+                # (JS ===, the same underlying binding) rather than Python identity.
+                if _d1_database is None or _d1_database.binding != binding:
+                    _d1_database = D1Database(binding)
+                return _d1_database
     return SqliteDatabase(DB_PATH)
 
 
 # Predefined color palette for clusters (pastel theme)
-CLUSTER_COLORS = [
+CLUSTER_COLORS = (
     "#1f77b4",
     "#ff7f0e",
     "#2ca02c",
@@ -255,9 +393,10 @@ CLUSTER_COLORS = [
     "#bd9e39",
     "#ad494a",
     "#a55194",
-]
+)
 
 
+@functools.cache
 def get_cluster_color(cluster_id: int) -> str:
     """Get consistent color for a cluster."""
     if cluster_id < 0:
@@ -281,88 +420,68 @@ async def get_papers(
     cluster_id: int | None = Query(None, description="Filter by cluster ID"),
     limit: int | None = Query(None, description="Limit number of results"),
     sample_size: int | None = Query(None, description="Sample N most recent papers per cluster"),
+    include_titles: bool = Query(True, description="Include paper titles (omit to shrink the payload)"),
 ):
     """Get all papers with coordinates and cluster information (gzip compressed)."""
     start_time = time.time()
+    is_full_dataset = cluster_id is None and limit is None and sample_size is None and include_titles
+    title_column = _title_column(include_titles)
+
+    if is_full_dataset and (cached_response := _get_cached_response("papers")) is not None:
+        return cached_response
 
     # Check if R2 cache is available (production mode)
     # Only use R2 cache if no filters are applied (full dataset request)
     env = request.scope.get("env")
     r2_assets_url = getattr(env, "R2_ASSETS_URL", None) if env else None
 
-    if r2_assets_url and cluster_id is None and limit is None and sample_size is None:
+    if r2_assets_url and is_full_dataset:
         # Fetch from R2 cache using native Workers fetch API
         logger.info(f"Fetching papers from R2: {r2_assets_url}")
         try:
-            from js import fetch as js_fetch
-
-            r2_url = f"{r2_assets_url}/cache-papers.gz"
-            response = await js_fetch(r2_url)
-
-            if not response.ok:
-                raise Exception(f"R2 fetch failed with status {response.status}")
-
-            # Get the response as bytes (arrayBuffer)
-            array_buffer = await response.arrayBuffer()
-            # Convert JavaScript ArrayBuffer to Python bytes
-            content = bytes(array_buffer.to_py())
+            content = await _fetch_r2_asset(f"{r2_assets_url}/cache-papers.gz")
 
-            # Return the gzipped content directly
-            return Response(
-                content=content,
-                media_type="application/octet-stream",
-                headers={"X-Content-Compressed": "gzip"},
-            )
+            # Return the gzipped content directly, keeping it in-process for later requests
+            return _cache_response("papers", content, "application/octet-stream", {"X-Content-Compressed": "gzip"})
         except Exception as e:
             logger.warning(f"Failed to fetch from R2, falling back to database: {e}")
             # Fall through to database query
 
     db = get_database(request)
+    body = _PapersBodyWriter()
 
     # Query papers table directly
-    # If sample_size is specified, use a subquery approach with GROUP BY and random sampling
+    # If sample_size is specified, keep the N most recent papers per cluster
     if sample_size is not None and cluster_id is None:
         query_start = time.time()
 
-        # Use a simpler approach: get papers ordered by cluster and year,
-        # then limit in Python (more efficient than N queries)
-        # But ONLY fetch what we need with LIMIT
-        max_clusters = 100
-        max_fetch = sample_size * max_clusters  # Fetch at most this many total
-
-        all_rows = await db.fetch_all(
-            """
-            SELECT id, title, x, y, z, cluster_id,
-                   COALESCE(claude_label, cluster_label) as cluster_label,
+        # Rank papers within each cluster so SQLite returns only the rows we keep
+        rows = await db.fetch_all(
+            f"""
+            SELECT id, title, x, y, z, cluster_id, cluster_label,
                    field_subfield, publication_year, classification
-            FROM papers
-            WHERE x IS NOT NULL AND y IS NOT NULL AND cluster_id IS NOT NULL
-            ORDER BY cluster_id, publication_year DESC, id DESC
-            LIMIT ?
+            FROM (
+                SELECT id, {title_column}, x, y, z, cluster_id,
+                       COALESCE(claude_label, cluster_label) as cluster_label,
+                       field_subfield, publication_year, classification,
+                       ROW_NUMBER() OVER (PARTITION BY cluster_id ORDER BY publication_year DESC, id DESC) as rn
+                FROM papers
+                WHERE x IS NOT NULL AND y IS NOT NULL AND cluster_id IS NOT NULL
+            )
+            WHERE rn <= ?
+            ORDER BY cluster_id, rn
             """,
-            (max_fetch,),
+            (sample_size,),
         )
 
-        # Sample N papers per cluster in Python (fast since data is pre-sorted)
-        cluster_samples = {}
-        for row in all_rows:
-            cid = row["cluster_id"]
-            if cid not in cluster_samples:
-                cluster_samples[cid] = []
-            if len(cluster_samples[cid]) < sample_size:
-                cluster_samples[cid].append(row)
-
-        # Flatten back to a list
-        rows = []
-        for cid in sorted(cluster_samples.keys()):
-            rows.extend(cluster_samples[cid])
-
         query_time = time.time() - query_start
-        logger.info(f"DB Query (sample_size={sample_size}): {query_time:.3f}s, fetched {len(all_rows)} rows, sampled {len(rows)} papers from {len(cluster_samples)} clusters")
+        logger.info(f"DB Query (sample_size={sample_size}): {query_time:.3f}s, sampled {len(rows)} papers")
+
+        body.write(rows)
     else:
         # Original query for full data or single cluster
-        query = """
-            SELECT id, title, x, y, z, cluster_id,
+        query = f"""
+            SELECT id, {title_column}, x, y, z, cluster_id,
                    COALESCE(claude_label, cluster_label) as cluster_label,
                    field_subfield, publication_year, classification
             FROM papers
@@ -380,48 +499,27 @@ async def get_papers(
             query += " LIMIT ?"
             params.append(limit)
 
+        # Encode each batch as it is fetched, so rows, JSON and gzip output are never all held at once
         query_start = time.time()
-        rows = await db.fetch_all(query, params)
+        async for batch in db.fetch_batches(query, params):
+            body.write(batch)
         query_time = time.time() - query_start
 
-        logger.info(f"DB Query (cluster_id={cluster_id}, limit={limit}): {query_time:.3f}s, returned {len(rows)} papers")
-
-    papers = [
-        PaperSummary(
-            id=row["id"],
-            title=row["title"],
-            x=row["x"],
-            y=row["y"],
-            z=row["z"],
-            cluster_id=row["cluster_id"],
-            cluster_label=row["cluster_label"],
-            field_subfield=row["field_subfield"],
-            publication_year=row["publication_year"],
-            classification=row["classification"],
-        )
-        for row in rows
-    ]
-
-    response_data = PapersResponse(papers=papers)
-
-    # Compress the JSON response
-    serialization_start = time.time()
-    json_str = json.dumps(response_data.model_dump())
-    serialization_time = time.time() - serialization_start
-
-    compression_start = time.time()
-    compressed_content = gzip.compress(json_str.encode("utf-8"), compresslevel=6)
-    compression_time = time.time() - compression_start
+        logger.info(f"DB Query + encoding (cluster_id={cluster_id}, limit={limit}): {query_time:.3f}s, returned {body.count} papers")
 
+    compressed_content = body.finish()
     total_time = time.time() - start_time
 
-    uncompressed_size = len(json_str.encode("utf-8"))
+    uncompressed_size = body.uncompressed_size
     compressed_size = len(compressed_content)
     compression_ratio = (compressed_size / uncompressed_size) * 100
 
-    logger.info(f"Serialization: {serialization_time:.3f}s, Compression: {compression_time:.3f}s, Total: {total_time:.3f}s")
+    logger.info(f"Total: {total_time:.3f}s")
     logger.info(f"Size: {uncompressed_size:,} -> {compressed_size:,} bytes ({compression_ratio:.1f}% compression)")
 
+    if is_full_dataset:
+        return _cache_response("papers", compressed_content, "application/octet-stream", {"X-Content-Compressed": "gzip"})
+
     return Response(
         content=compressed_content,
         media_type="application/octet-stream",
@@ -508,11 +606,36 @@ async def get_paper(paper_id: int, request: Request):
     )
 
 
-@app.get("/api/clusters", response_model=ClustersResponse)
+# Whether each optional table exists, with the time it was checked. Probing sqlite_master
+# is cheap and never fails, unlike querying a missing table; it is re-checked once per
+# cache window so tables built by a later cache generator run are picked up.
+_table_checks: dict[str, tuple[float, bool]] = {}
+
+
+async def _has_table(db: BaseDatabase, name: str) -> bool:
+    """Return whether the given table exists, probing at most once per cache window."""
+    checked = _table_checks.get(name)
+    if checked is None or time.monotonic() - checked[0] > CACHE_TTL_SECONDS:
+        row = await db.fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+        if row is None:
+            logger.info(f"Table {name} not found, using the fallback query")
+        checked = _table_checks[name] = (time.monotonic(), row is not None)
+    return checked[1]
+
+
+@app.get("/api/clusters")
 async def get_clusters(request: Request):
-    """Get cluster statistics and colors."""
+    """Get cluster statistics and colors (gzip compressed).
+
+    Every path returns a ClustersResponse JSON body gzipped as application/octet-stream
+    with an X-Content-Compressed: gzip header, the same contract as /api/papers, so
+    clients decode it with fetchCompressed whichever source served it.
+    """
     start_time = time.time()
 
+    if (cached_response := _get_cached_response("clusters")) is not None:
+        return cached_response
+
     # Check if R2 cache is available (production mode)
     env = request.scope.get("env")
     r2_assets_url = getattr(env, "R2_ASSETS_URL", None) if env else None
@@ -521,28 +644,26 @@ async def get_clusters(request: Request):
         # Fetch from R2 cache using native Workers fetch API
         logger.info(f"Fetching clusters from R2: {r2_assets_url}")
         try:
-            from js import fetch as js_fetch
-
-            r2_url = f"{r2_assets_url}/cache-clusters.gz"
-            response = await js_fetch(r2_url)
-
-            if not response.ok:
-                raise Exception(f"R2 fetch failed with status {response.status}")
+            content = await _fetch_r2_asset(f"{r2_assets_url}/cache-clusters.gz")
 
-            # Get the response as bytes (arrayBuffer)
-            array_buffer = await response.arrayBuffer()
-            # Convert JavaScript ArrayBuffer to Python bytes
-            content = bytes(array_buffer.to_py())
-
-            # Decompress and return as JSON
-            decompressed = gzip.decompress(content)
-            return JSONResponse(content=json.loads(decompressed))
+            # The R2 object is already gzipped JSON in the response shape; pass it through
+            return _cache_response("clusters", content, "application/octet-stream", {"X-Content-Compressed": "gzip"})
         except Exception as e:
             logger.warning(f"Failed to fetch from R2, falling back to database: {e}")
             # Fall through to database query
 
     db = get_database(request)
 
+    # Serve the pre-built payload from cache_generator.py when it exists; the stored
+    # bytes are already gzipped JSON, so nothing is re-serialized per request
+    cached = None
+    if await _has_table(db, "cache_clusters"):
+        cached = await db.fetch_one("SELECT data, encoding FROM cache_clusters WHERE id = 1")
+
+    if cached and cached["encoding"] == "gzip":
+        logger.info(f"Served clusters from cache table in {time.time() - start_time:.3f}s")
+        return _cache_response("clusters", _blob_to_bytes(cached["data"]), "application/octet-stream", {"X-Content-Compressed": "gzip"})
+
     # Query papers table directly
     rows = await db.fetch_all(
         """
@@ -556,8 +677,9 @@ async def get_clusters(request: Request):
     """
     )
 
+    # Values come straight from SQLite with known types, so skip per-row validation
     clusters = [
-        ClusterInfo(
+        ClusterInfo.model_construct(
             cluster_id=row["cluster_id"],
             cluster_label=row["cluster_label"],
             count=row["count"],
@@ -566,10 +688,14 @@ async def get_clusters(request: Request):
         for row in rows
     ]
 
+    # Emit the response JSON directly instead of wrapping in ClustersResponse and
+    # validating it again, then gzip it like the pre-built payloads
+    compressed_content = zlib.compress(serialize({"clusters": clusters}), GZIP_COMPRESSLEVEL, wbits=31)
+
     total_time = time.time() - start_time
     logger.info(f"Generated clusters response in {total_time:.3f}s")
 
-    return ClustersResponse(clusters=clusters)
+    return _cache_response("clusters", compressed_content, "application/octet-stream", {"X-Content-Compressed": "gzip"})
 
 
 @app.get("/api/search")
@@ -577,44 +703,53 @@ async def search_papers(
     request: Request,
     q: str = Query(..., description="Search query for title or field"),
     limit: int = Query(100, description="Maximum number of results"),
+    include_titles: bool = Query(True, description="Include paper titles (omit to shrink the payload)"),
 ):
     """Search papers by title or field (gzip compressed)."""
     db = get_database(request)
-
-    query = """
-        SELECT id, title, x, y, z, cluster_id,
-               COALESCE(claude_label, cluster_label) as cluster_label,
-               field_subfield, publication_year, classification
-        FROM papers
-        WHERE x IS NOT NULL AND y IS NOT NULL
-            AND (title LIKE ? OR field_subfield LIKE ?)
-        ORDER BY id
-        LIMIT ?
-    """
-    search_pattern = f"%{q}%"
-    rows = await db.fetch_all(query, (search_pattern, search_pattern, limit))
-
-    papers = [
-        PaperSummary(
-            id=row["id"],
-            title=row["title"],
-            x=row["x"],
-            y=row["y"],
-            z=row["z"],
-            cluster_id=row["cluster_id"],
-            cluster_label=row["cluster_label"],
-            field_subfield=row["field_subfield"],
-            publication_year=row["publication_year"],
-            classification=row["classification"],
+    title_column = _title_column(include_titles)
+
+    rows = None
+    # The trigram index from cache_generator.py matches substrings of 3+ characters like
+    # LIKE '%q%', with two differences: it folds case across Unicode where LIKE folds only
+    # ASCII, so "ärger" finds "Ärger" only here; and the IN subquery collects every match
+    # before ORDER BY id LIMIT, where the LIKE scan stops after `limit` rows. Shorter
+    # queries and databases without the index use LIKE.
+    if len(q) >= 3 and await _has_table(db, "papers_fts"):
+        rows = await db.fetch_all(
+            f"""
+            SELECT id, {title_column}, x, y, z, cluster_id,
+                   COALESCE(claude_label, cluster_label) as cluster_label,
+                   field_subfield, publication_year, classification
+            FROM papers
+            WHERE id IN (SELECT rowid FROM papers_fts WHERE papers_fts MATCH ?)
+                AND x IS NOT NULL AND y IS NOT NULL
+            ORDER BY id
+            LIMIT ?
+        """,
+            ('"' + q.replace('"', '""') + '"', limit),
         )
-        for row in rows
-    ]
 
-    response_data = PapersResponse(papers=papers)
+    if rows is None:
+        query = f"""
+            SELECT id, {title_column}, x, y, z, cluster_id,
+                   COALESCE(claude_label, cluster_label) as cluster_label,
+                   field_subfield, publication_year, classification
+            FROM papers
+            WHERE x IS NOT NULL AND y IS NOT NULL
+                AND (title LIKE ? ESCAPE '\\' OR field_subfield LIKE ? ESCAPE '\\')
+            ORDER BY id
+            LIMIT ?
+        """
+        # Escape LIKE wildcards so % and _ match literally, as they do in the FTS query
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        search_pattern = f"%{escaped}%"
+        rows = await db.fetch_all(query, (search_pattern, search_pattern, limit))
 
     # Compress the JSON response
-    json_str = json.dumps(response_data.model_dump())
-    compressed_content = gzip.compress(json_str.encode("utf-8"), compresslevel=6)
+    body = _PapersBodyWriter()
+    body.write(rows)
+    compressed_content = body.finish()
 
     return Response(
         content=compressed_content,
@@ -749,14 +884,16 @@ async def get_stats(request: Request):
     """Get overall statistics."""
     db = get_database(request)
 
-    total_row = await db.fetch_one("SELECT COUNT(*) as total FROM papers")
-    total = total_row["total"] if total_row else 0
-
-    with_coords_row = await db.fetch_one("SELECT COUNT(*) as with_coords FROM papers WHERE x IS NOT NULL")
-    with_coords = with_coords_row["with_coords"] if with_coords_row else 0
-
-    num_clusters_row = await db.fetch_one("SELECT COUNT(DISTINCT cluster_id) as num_clusters FROM papers WHERE cluster_id IS NOT NULL")
-    num_clusters = num_clusters_row["num_clusters"] if num_clusters_row else 0
+    # One scan for all three counts; COUNT(column) skips NULLs, so no WHERE clauses are needed
+    row = await db.fetch_one(
+        """
+        SELECT COUNT(*) as total, COUNT(x) as with_coords, COUNT(DISTINCT cluster_id) as num_clusters
+        FROM papers
+        """
+    )
+    total = row["total"] if row else 0
+    with_coords = row["with_coords"] if row else 0
+    num_clusters = row["num_clusters"] if row else 0
 
     return {
         "total_papers": total,
@@ -792,34 +929,18 @@ async def get_temporal_data(
         (min_year, max_year),
     )
 
-    # Organize data by cluster
-    cluster_data_map: dict[int, dict[str, Any]] = {}
-    for row in rows:
-        cluster_id = row["cluster_id"]
-        cluster_label = row["cluster_label"]
-        year = row["publication_year"]
-        count = row["count"]
-
-        if cluster_id not in cluster_data_map:
-            cluster_data_map[cluster_id] = {
-                "cluster_id": cluster_id,
-                "cluster_label": cluster_label,
-                "color": get_cluster_color(cluster_id),
-                "temporal_data": [],
-            }
-
-        cluster_data_map[cluster_id]["temporal_data"].append({"year": int(year), "count": count})
-
-    # Convert to list and create response objects
-    clusters = [
-        ClusterTemporalData(
-            cluster_id=data["cluster_id"],
-            cluster_label=data["cluster_label"],
-            color=data["color"],
-            temporal_data=[TemporalDataPoint(year=point["year"], count=point["count"]) for point in data["temporal_data"]],
+    # Rows arrive ordered by cluster_id, so each cluster is one contiguous run
+    clusters = []
+    for cluster_id, group in itertools.groupby(rows, key=lambda row: row["cluster_id"]):
+        points = list(group)
+        clusters.append(
+            ClusterTemporalData(
+                cluster_id=cluster_id,
+                cluster_label=points[0]["cluster_label"],
+                color=get_cluster_color(cluster_id),
+                temporal_data=[TemporalDataPoint(year=int(point["publication_year"]), count=point["count"]) for point in points],
+            )
         )
-        for data in cluster_data_map.values()
-    ]
 
     return TemporalDataResponse(clusters=clusters)
 
@@ -390,7 +390,7 @@ export default function LaionApp() {
   useEffect(() => {
     Promise.all([
       fetchCompressed<PapersResponse>(getApiUrl("/api/papers")),
-      fetch(getApiUrl("/api/clusters")).then((res) => res.json()),
+      fetchCompressed<ClustersResponse>(getApiUrl("/api/clusters")),
     ])
       .then(
         ([papersData, clustersData]: [PapersResponse, ClustersResponse]) => {
@@ -5,7 +5,7 @@ import { useEffect, useMemo, useRef, useState } from "react";
 import Plot from "react-plotly.js";
 import { clustersDataAtom } from "../state/chartDataCache";
 import type { ClusterInfo, ClustersResponse } from "../types";
-import { getApiUrl } from "../utils/api";
+import { fetchCompressed, getApiUrl } from "../utils/api";
 
 export function DistributionChart({
   onClusterClick,
@@ -35,9 +35,8 @@ export function DistributionChart({
     }
 
     // Otherwise, fetch the data
-    fetch(getApiUrl("/api/clusters"))
-      .then((res) => res.json())
-      .then((clustersData: ClustersResponse) => {
+    fetchCompressed<ClustersResponse>(getApiUrl("/api/clusters"))
+      .then((clustersData) => {
         const clusters: ClusterInfo[] = clustersData.clusters;
         // Sort by count in descending order
         const sorted = [...clusters].sort((a, b) => b.count - a.count);